@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The live comment stream (notes.views.comment_stream) keeps its connection
+open, so serve the site through this module with an ASGI server, e.g.
+    uvicorn config.asgi:application
 """
 
 import os
@@ -0,0 +1,44 @@
+import ssl
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends.console import EmailBackend as ConsoleEmailBackend
+from django.core.mail.backends.smtp import EmailBackend
+from django.utils.functional import cached_property
+
+from config.settings.environment import env
+
+
+class CertifiEmailBackend(EmailBackend):
+    """
+    SMTP backend verifying the server against certifi's CA bundle.
+
+    The SMTP credentials come from SMTP_EMAIL / SMTP_PASS (environment or
+    .env) unless passed in or set in the settings, and are only looked up
+    when an email is actually sent. Without them DEBUG prints the emails
+    to the console, anything else refuses to send.
+    """
+
+    def __init__(self, username=None, password=None, **kwargs):
+        super().__init__(username=username, password=password, **kwargs)
+        if not self.username:
+            self.username = env('SMTP_EMAIL', '')
+        if not self.password:
+            self.password = env('SMTP_PASS', '')
+
+    def send_messages(self, email_messages):
+        if not (self.username and self.password):
+            if settings.DEBUG:
+                return ConsoleEmailBackend(fail_silently=self.fail_silently).send_messages(email_messages)
+            raise ImproperlyConfigured("Set SMTP_EMAIL and SMTP_PASS to send email.")
+        return super().send_messages(email_messages)
+
+    @cached_property
+    def ssl_context(self):
+        # imported here so that only sending an email pays for it
+        import certifi
+
+        context = ssl.create_default_context(cafile=certifi.where())
+        if self.ssl_certfile or self.ssl_keyfile:
+            context.load_cert_chain(self.ssl_certfile, self.ssl_keyfile)
+        return context
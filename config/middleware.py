@@ -0,0 +1,79 @@
+import secrets
+import zlib
+from gzip import GzipFile
+
+from django.middleware.gzip import GZipMiddleware, re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import get_random_string
+from django.utils.text import StreamingBuffer
+
+
+class FlushingGzip:
+    """A single gzip stream where every compressed chunk can be decoded as soon as it arrives."""
+
+    def __init__(self, max_random_bytes):
+        self.buf = StreamingBuffer()
+        # random file name length against BREACH, like Django's compress_sequence
+        filename = get_random_string(secrets.randbelow(max_random_bytes + 1))
+        self.file = GzipFile(filename=filename, mode='wb', compresslevel=6, fileobj=self.buf, mtime=0)
+
+    def compress(self, chunk):
+        if chunk:
+            self.file.write(chunk)
+            self.file.flush(zlib.Z_SYNC_FLUSH)
+        return self.buf.read()
+
+    def close(self):
+        self.file.close()
+        return self.buf.read()
+
+
+class StreamingGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that flushes after every chunk of a streaming response.
+
+    Django's version lets zlib hold streamed chunks until its buffer fills
+    (sync) or starts a new gzip member per chunk (async). Here the head of a
+    streamed list page reaches the browser right away, inside one gzip stream.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming:
+            return super().process_response(request, response)
+
+        if response.has_header("Content-Encoding"):
+            return response
+
+        # event streams stay open, a deflate state per idle subscriber adds up
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if not re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            return response
+
+        gzip = FlushingGzip(self.max_random_bytes)
+        original_iterator = response.streaming_content
+
+        if response.is_async:
+            async def gzip_wrapper():
+                async for chunk in original_iterator:
+                    yield gzip.compress(chunk)
+                yield gzip.close()
+        else:
+            def gzip_wrapper():
+                for chunk in original_iterator:
+                    yield gzip.compress(chunk)
+                yield gzip.close()
+
+        response.streaming_content = gzip_wrapper()
+        # we won't know the compressed size until we stream it
+        del response.headers["Content-Length"]
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "gzip"
+
+        return response
@@ -0,0 +1,45 @@
+import hashlib
+from html import unescape
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Bump this whenever the Markdown extensions or sanitizer rules change,
+# then run `python manage.py rerender_markdown` to refresh stored HTML.
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'sane_lists', 'nl2br']
+
+EXCERPT_LENGTH = 280
+
+
+def content_hash(text):
+    """Hash of the source text plus renderer version, stored next to the HTML."""
+    source = f"{RENDERER_VERSION}:{text or ''}"
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def render_markdown(text):
+    """Render Markdown to HTML and strip anything unsafe."""
+    # imported here so that only saving and re-rendering pay for them
+    import markdown
+    import nh3
+
+    html = markdown.markdown(text or '', extensions=MARKDOWN_EXTENSIONS)
+    return nh3.clean(html)
+
+
+def make_excerpt(html):
+    """Plain text preview used by the list pages."""
+    return Truncator(unescape(strip_tags(html)).strip()).chars(EXCERPT_LENGTH)
+
+
+def render_all(text):
+    """Return (html, excerpt, hash) for one source text."""
+    html = render_markdown(text)
+    return html, make_excerpt(html), content_hash(text)
+
+
+def render_batch(texts):
+    """Render a list of source texts, used by the parallel re-render command."""
+    return [render_all(text) for text in texts]
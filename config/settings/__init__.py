@@ -0,0 +1,12 @@
+"""
+Settings package: base.py holds the shared settings, dev.py and prod.py
+the per-environment ones. DJANGO_ENV=prod switches to production, or point
+DJANGO_SETTINGS_MODULE at config.settings.prod directly.
+"""
+
+import os
+
+if os.environ.get('DJANGO_ENV') == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
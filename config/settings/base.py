@@ -1,5 +1,5 @@
 """
-Django settings for config project.
+Django settings shared by every environment, see dev.py and prod.py.
 
 Generated by 'django-admin startproject' using Django 5.2.
 
@@ -12,30 +12,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
-import certifi
-import environ
-
-#creaete SECURE connection
-os.environ["SSL_CERTIFI_FILE"] = certifi.where()
-
-#load env file
-env = environ.Env()
-environ.Env.read_env()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-
-# Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
-
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-pm@uhahrfl9$@)y4lb&jy1l_pw^y*+)x!=c@l2e*m0&ge*+2km'
-
-# SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
-
-ALLOWED_HOSTS = []
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
 # Application definition
@@ -55,6 +34,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # compresses streamed list pages chunk by chunk
+    'config.middleware.StreamingGZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -81,6 +62,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 
 # Database
@@ -141,13 +123,20 @@ STATICFILES_DIRS =  [os.path.join(BASE_DIR, 'static')]
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Live comment stream (Server-Sent Events)
+# the in-process broker only reaches subscribers of the same worker, use
+# 'notes.streams.PollingCommentBroker' when running several workers
+NOTES_COMMENT_BROKER = 'notes.streams.CommentBroker'
+
+
 # sendGrid is the most POPULAR certified company to send emails
 #Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# the backend loads certifi for the SECURE connection on first use only
+EMAIL_BACKEND = 'config.mail.CertifiEmailBackend'
 
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
-EMAIL_HOST_USER = env('SMTP_EMAIL')
-EMAIL_HOST_PASSWORD = env('SMTP_PASS')
\ No newline at end of file
+# EMAIL_HOST_USER / EMAIL_HOST_PASSWORD stay empty here, the backend reads
+# SMTP_EMAIL / SMTP_PASS when the first email is sent
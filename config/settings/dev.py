@@ -0,0 +1,12 @@
+from .base import *  # noqa: F401,F403
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-pm@uhahrfl9$@)y4lb&jy1l_pw^y*+)x!=c@l2e*m0&ge*+2km'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = []
@@ -0,0 +1,27 @@
+import os
+from functools import cache
+from pathlib import Path
+
+# same place django-environ looked for it next to the old settings.py
+ENV_FILE = Path(__file__).resolve().parent.parent / '.env'
+
+
+@cache
+def _env_file():
+    """Parse the .env file the first time a variable is missing from the environment."""
+    values = {}
+    if ENV_FILE.exists():
+        for line in ENV_FILE.read_text().splitlines():
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            values[key.removeprefix('export ').strip()] = value.strip().strip('\'"')
+    return values
+
+
+def env(name, default=None):
+    """Read a variable from the environment, falling back to the .env file."""
+    if name in os.environ:
+        return os.environ[name]
+    return _env_file().get(name, default)
@@ -0,0 +1,15 @@
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .environment import env
+
+SECRET_KEY = env('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY for production.")
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host.strip() for host in env('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+# the in-process broker only reaches subscribers of the same worker
+NOTES_COMMENT_BROKER = 'notes.streams.PollingCommentBroker'
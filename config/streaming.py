@@ -0,0 +1,41 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.template import loader
+from django.utils.safestring import mark_safe
+
+CHUNK_SIZE = 50
+
+# the page template prints {{ cards }} where the streamed cards go
+CARDS_MARKER = mark_safe('<!-- cards -->')
+
+
+def stream_list_page(request, template_name, context, cards_template, queryset, context_name, chunk_size=CHUNK_SIZE):
+    """
+    Stream a list page: the page around the cards is rendered and sent
+    first, then the cards follow chunk by chunk while the queryset is read
+    with .iterator(), so neither the first byte nor memory grow with it.
+    """
+    page = loader.render_to_string(template_name, {**context, 'cards': CARDS_MARKER}, request)
+    head, tail = page.split(CARDS_MARKER, 1)
+    cards = loader.get_template(cards_template)
+
+    def content():
+        yield head
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            yield cards.render({context_name: chunk}, request)
+        yield tail
+
+    if isinstance(request, ASGIRequest):
+        return StreamingHttpResponse(_async_content(content()))
+    return StreamingHttpResponse(content())
+
+
+async def _async_content(parts):
+    # the ORM is sync only, pull every chunk on the request's sync thread
+    next_part = sync_to_async(next, thread_sensitive=True)
+    while (part := await next_part(parts, None)) is not None:
+        yield part
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:26
+
+import hashlib
+from html import unescape
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def render_v1(text):
+    """Frozen copy of the version 1 renderer, see config/rendering.py."""
+    import markdown
+    import nh3
+
+    html = nh3.clean(markdown.markdown(text or '', extensions=['fenced_code', 'tables', 'sane_lists', 'nl2br']))
+    excerpt = Truncator(unescape(strip_tags(html)).strip()).chars(280)
+    digest = hashlib.sha256(f"1:{text or ''}".encode('utf-8')).hexdigest()
+    return html, excerpt, digest
+
+
+def render_existing(apps, schema_editor):
+    Project = apps.get_model('content', 'Project')
+    rows = list(Project.objects.only('description'))
+    for row in rows:
+        row.description_html, row.excerpt, row.description_hash = render_v1(row.description)
+    Project.objects.bulk_update(rows, ['description_html', 'excerpt', 'description_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='description_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
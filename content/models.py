@@ -1,5 +1,7 @@
 from django.db import models
 
+from config import rendering
+
 class Skill(models.Model):
     name = models.CharField(max_length=50)
 
@@ -10,10 +12,25 @@ class Skill(models.Model):
 class Project(models.Model):
     name = models.CharField(max_length=150)
     description = models.TextField()
+    description_html = models.TextField(blank=True, editable=False)
+    description_hash = models.CharField(max_length=64, blank=True, editable=False)
+    excerpt = models.CharField(max_length=300, blank=True, editable=False)
     year = models.IntegerField()
     image = models.ImageField(upload_to='static/')
     repository = models.URLField() 
     skills = models.ManyToManyField(Skill)
+
+    class Meta:
+        indexes = [
+            # projects_list_view shows the newest projects first
+            models.Index(fields=['-year', '-id'], name='project_year_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # only re-render the Markdown when the source (or renderer) changed
+        if self.description_hash != rendering.content_hash(self.description):
+            self.description_html, self.excerpt, self.description_hash = rendering.render_all(self.description)
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.name} - ({self.year})"
\ No newline at end of file
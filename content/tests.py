@@ -1,3 +1,27 @@
 from django.test import TestCase
+from django.urls import reverse
+
+from notes.tests import QueryPlanTestMixin
+
+from .models import Project, Skill
 
 # Create your tests here.
+
+
+class ProjectQueryPlanTests(QueryPlanTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        skills = Skill.objects.bulk_create(Skill(name=f"Skill {i}") for i in range(5))
+        projects = Project.objects.bulk_create(
+            Project(name=f"Project {i}", description="Hello", year=2000 + i % 25,
+                    image="static/p.png", repository="https://example.com")
+            for i in range(150)
+        )
+        Project.skills.through.objects.bulk_create(
+            Project.skills.through(project=project, skill=skills[i % 5])
+            for i, project in enumerate(projects)
+        )
+
+    def test_list_plan(self):
+        self.assertViewUsesIndexes(reverse("projects_list"))
@@ -2,14 +2,21 @@ from django.shortcuts import render, get_object_or_404, redirect
 from .models import Project
 from django.contrib.auth.decorators import login_required
 from .forms import ProjectForm
+from config.streaming import stream_list_page
 
 # Create your views here.
 
 def projects_list_view(request):
 
-    projects = Project.objects.all()
+    # the cards only show the excerpt, skip loading the full description
+    projects = (
+        Project.objects.defer('description', 'description_html')
+        .prefetch_related('skills')
+        .order_by('-year', '-id')
+    )
 
-    return render(request,'content/projects_list.html', {'projects': projects})
+    # send the page head right away, the cards follow in chunks
+    return stream_list_page(request, 'content/projects_list.html', {}, 'content/projects_cards.html', projects, 'projects')
 
 # @login_required
 # def project_detail_view(request, pk):
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_link_url_note_slug_notecomment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['-created_on'], name='note_created_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notecomment',
+            index=models.Index(fields=['note', '-created_on'], name='notecomment_note_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='notecomment',
+            name='note',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='notes.note'),
+        ),
+    ]
@@ -5,18 +5,29 @@ from django.contrib.auth.models import User
 
 from django.utils.text import slugify
 
+from config import rendering
+
 class Note(models.Model):
     title = models.CharField(max_length=50)
     content = models.TextField()
+    content_html = models.TextField(blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    excerpt = models.CharField(max_length=300, blank=True, editable=False)
 
     image = models.ImageField(upload_to='notes/', blank=True, null=True)
 
     link_url = models.URLField(blank=True, null=True)
 
-    slug = models.SlugField(max_length=60, unique=False, blank=True)
+    slug = models.SlugField(max_length=60, unique=False, blank=True, db_index=True)
 
     created_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # NoteList orders by newest first
+            models.Index(fields=['-created_on'], name='note_created_on_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
             base_slug = slugify(self.title)
@@ -26,16 +37,26 @@ class Note(models.Model):
                 slug = f"{base_slug}-{counter}"
                 counter += 1
             self.slug = slug
+        # only re-render the Markdown when the source (or renderer) changed
+        if self.content_hash != rendering.content_hash(self.content):
+            self.content_html, self.excerpt, self.content_hash = rendering.render_all(self.content)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
 class NoteComment(models.Model):
-    note = models.ForeignKey(Note, on_delete=models.CASCADE)
+    # covered by the (note, -created_on) index below
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, db_index=False)
     content = models.TextField()
     created_on = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # comments of a note are always read newest first
+            models.Index(fields=['note', '-created_on'], name='notecomment_note_created_idx'),
+        ]
+
     def __str__(self):
         return self.note.title + " - " + self.content[0:50] + "..."
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Pub/sub fan-out for the live comment stream (Server-Sent Events).
+
+Every open stream holds one small bounded queue. Publishing only pushes the
+event onto those queues, so idle subscribers cost a parked coroutine and
+nothing else. A subscriber that falls behind is marked as lagged instead of
+buffering without limit; the stream then catches up from the database using
+the id of the last comment it sent.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+QUEUE_SIZE = 100
+KEEPALIVE = 15
+
+
+def comment_event(comment):
+    """Format a NoteComment as an SSE message, the comment id is the event id."""
+    data = json.dumps({
+        'id': comment.id,
+        'author': comment.author.username,
+        'content': comment.content,
+        'created_on': comment.created_on,
+    }, cls=DjangoJSONEncoder)
+    return comment.id, f"id: {comment.id}\nevent: comment\ndata: {data}\n\n"
+
+
+class Subscription:
+    def __init__(self, note_id, loop, last_id=0):
+        self.note_id = note_id
+        self.loop = loop
+        self.last_id = last_id
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.lagged = False
+
+    def put(self, event):
+        # runs on the subscriber's event loop
+        if self.queue.full():
+            self.lagged = True
+            return
+        self.queue.put_nowait(event)
+
+    def drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.lagged = False
+
+
+class CommentBroker:
+    """In-process broker, fine for a single ASGI worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, note_id, last_id=0):
+        sub = Subscription(note_id, asyncio.get_running_loop(), last_id)
+        with self._lock:
+            self._subscribers[note_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.note_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.note_id]
+
+    def publish(self, note_id, event):
+        """Safe to call from sync views running in a worker thread."""
+        self._fan_out(note_id, event)
+
+    def _fan_out(self, note_id, event):
+        with self._lock:
+            subs = list(self._subscribers.get(note_id, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.put, event)
+            except RuntimeError:
+                # the subscriber's loop is already closed
+                self.unsubscribe(sub)
+
+
+class PollingCommentBroker(CommentBroker):
+    """
+    Local stand-in for a shared broker when running several workers.
+
+    Each worker polls the database once per interval for every note that has
+    at least one local subscriber and fans the new comments out locally, so
+    the cost stays at one query per watched note per worker.
+    """
+
+    interval = 1.0
+
+    def __init__(self):
+        super().__init__()
+        self._pollers = {}
+
+    def subscribe(self, note_id, last_id=0):
+        sub = super().subscribe(note_id, last_id)
+        if note_id not in self._pollers:
+            self._pollers[note_id] = sub.loop.create_task(self._poll(note_id))
+        return sub
+
+    def publish(self, note_id, event):
+        # every worker picks new comments up from the database
+        pass
+
+    async def _poll(self, note_id):
+        from .models import NoteComment
+
+        comments = NoteComment.objects.filter(note_id=note_id).select_related('author').order_by('id')
+        try:
+            # only push what is new from here on, every stream catches up on
+            # older comments from the database itself
+            last = await comments.values_list('id', flat=True).alast() or 0
+            while note_id in self._subscribers:
+                await asyncio.sleep(self.interval)
+                async for comment in comments.filter(id__gt=last):
+                    self._fan_out(note_id, comment_event(comment))
+                    last = comment.id
+        finally:
+            self._pollers.pop(note_id, None)
+
+
+async def comment_events(note_id, last_id=0):
+    """Async iterator of SSE messages for one note, ends when the client leaves."""
+    from .models import NoteComment
+
+    broker = get_broker()
+    sub = broker.subscribe(note_id, last_id)
+    comments = NoteComment.objects.filter(note_id=note_id).select_related('author').order_by('id')
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            # catch up from the database on connect, on resume and after lagging
+            async for comment in comments.filter(id__gt=sub.last_id):
+                sub.last_id, event = comment_event(comment)
+                yield event
+
+            while not sub.lagged:
+                try:
+                    comment_id, event = await asyncio.wait_for(sub.queue.get(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if comment_id > sub.last_id:
+                    sub.last_id = comment_id
+                    yield event
+            sub.drain()
+    finally:
+        broker.unsubscribe(sub)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        path = getattr(settings, 'NOTES_COMMENT_BROKER', 'notes.streams.CommentBroker')
+        _broker = import_string(path)()
+    return _broker
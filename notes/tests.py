@@ -1,3 +1,364 @@
-from django.test import TestCase
+import asyncio
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Note, NoteComment
+from .streams import QUEUE_SIZE, CommentBroker, PollingCommentBroker, comment_event, get_broker
 
 # Create your tests here.
+
+
+class QueryPlanTestMixin:
+    """
+    Run EXPLAIN QUERY PLAN on every SELECT a view issues and fail when a
+    table with at least `plan_min_rows` rows is read with a full table scan
+    or sorted through a temp B-tree.
+    """
+
+    plan_min_rows = 100
+
+    def _table_sizes(self):
+        sizes = {}
+        with connection.cursor() as cursor:
+            for table in connection.introspection.table_names(cursor):
+                quoted = connection.ops.quote_name(table)
+                cursor.execute(f"SELECT COUNT(*) FROM {quoted}")
+                sizes[table] = cursor.fetchone()[0]
+        return sizes
+
+    def _explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertViewUsesIndexes(self, url):
+        sizes = self._table_sizes()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+            # streamed pages only query while the body is read
+            b"".join(response.streaming_content) if response.streaming else response.content
+        self.assertEqual(response.status_code, 200)
+
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = self._explain(sql)
+            big_tables = set()
+            for step in plan:
+                words = step.split()
+                if words[0] in ("SCAN", "SEARCH") and sizes.get(words[1], 0) >= self.plan_min_rows:
+                    big_tables.add(words[1])
+                    if words[0] == "SCAN" and "USING" not in words:
+                        self.fail(f"Full table scan on {words[1]}:\n{sql}\n{plan}")
+            for step in plan:
+                if "TEMP B-TREE" in step and big_tables:
+                    self.fail(f"Temp B-tree sort on {', '.join(sorted(big_tables))}:\n{sql}\n{plan}")
+
+
+class NoteQueryPlanTests(QueryPlanTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="critter", password="pass")
+        Note.objects.bulk_create(
+            Note(title=f"Note {i}", content="Hello", slug=f"note-{i}")
+            for i in range(200)
+        )
+        cls.note = Note.objects.get(slug="note-42")
+        NoteComment.objects.bulk_create(
+            NoteComment(note=cls.note, content=f"Comment {i}", author=cls.user)
+            for i in range(200)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_list_plan(self):
+        self.assertViewUsesIndexes(reverse("notes_list"))
+
+    def test_detail_plan(self):
+        self.assertViewUsesIndexes(reverse("note-detail", args=[self.note.slug]))
+
+    def test_update_plan(self):
+        self.assertViewUsesIndexes(reverse("note-update", args=[self.note.slug]))
+
+    def test_delete_plan(self):
+        self.assertViewUsesIndexes(reverse("note-delete", args=[self.note.slug]))
+
+
+class NoteListStreamingTests(TestCase):
+
+    def test_list_streams_head_then_card_chunks(self):
+        Note.objects.bulk_create(
+            Note(title=f"Note {i}", content="Hello", slug=f"note-{i}")
+            for i in range(120)
+        )
+        response = self.client.get(reverse("notes_list"))
+        self.assertTrue(response.streaming)
+
+        chunks = list(response.streaming_content)
+        self.assertIn(b"Your notes", chunks[0])
+        self.assertNotIn(b"note-item", chunks[0])
+        # head, three chunks of 50 cards, tail
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(b"".join(chunks).count(b'class="note-item"'), 120)
+
+    async def test_list_streams_asynchronously_under_asgi(self):
+        await Note.objects.acreate(title="Async", content="Hello")
+        response = await self.async_client.get(reverse("notes_list"))
+        self.assertTrue(response.is_async)
+
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b"<h5>Async</h5>", body)
+
+
+class NoteMarkdownTests(TestCase):
+
+    def test_save_renders_sanitized_html(self):
+        note = Note.objects.create(title="Hi", content="**bold** <script>alert(1)</script>")
+        self.assertIn("<strong>bold</strong>", note.content_html)
+        self.assertNotIn("<script>", note.content_html)
+        self.assertEqual(note.excerpt, "bold")
+
+    def test_unchanged_content_is_not_rerendered(self):
+        note = Note.objects.create(title="Hi", content="*hello*")
+        note.content_html = "cached"
+        note.save()
+        self.assertEqual(note.content_html, "cached")
+
+        note.content = "*bye*"
+        note.save()
+        self.assertIn("<em>bye</em>", note.content_html)
+
+    def test_rerender_command_updates_stale_rows(self):
+        Note.objects.bulk_create([Note(title="Old", content="# Title", slug="old")])
+        call_command("rerender_markdown", workers=1, stdout=StringIO())
+        note = Note.objects.get(slug="old")
+        self.assertIn("<h1>Title</h1>", note.content_html)
+        self.assertEqual(note.excerpt, "Title")
+
+    def test_rerender_command_caps_batches_in_flight(self):
+        Note.objects.bulk_create(
+            Note(title=f"Old {i}", content=f"*note {i}*", slug=f"old-{i}")
+            for i in range(7)
+        )
+        current = Note.objects.create(title="Fresh", content="fresh")
+        Note.objects.filter(pk=current.pk).update(content_html="kept")
+
+        out = StringIO()
+        # one worker, so at most two batches of two rows are queued at a time
+        call_command("rerender_markdown", workers=1, batch_size=2, stdout=out)
+        self.assertIn("Re-rendered 7 notes.", out.getvalue())
+        for i in range(7):
+            self.assertIn(f"<em>note {i}</em>", Note.objects.get(slug=f"old-{i}").content_html)
+        self.assertEqual(Note.objects.get(pk=current.pk).content_html, "kept")
+
+
+class CommentBrokerTests(SimpleTestCase):
+
+    async def test_publish_reaches_subscribers_of_the_note(self):
+        broker = CommentBroker()
+        sub = broker.subscribe(1)
+        other = broker.subscribe(2)
+        broker.publish(1, (7, "event"))
+        await asyncio.sleep(0)
+        self.assertEqual(sub.queue.get_nowait(), (7, "event"))
+        self.assertTrue(other.queue.empty())
+
+    async def test_slow_subscriber_is_marked_lagged(self):
+        broker = CommentBroker()
+        sub = broker.subscribe(1)
+        for i in range(QUEUE_SIZE + 1):
+            broker.publish(1, (i, "event"))
+        await asyncio.sleep(0)
+        self.assertTrue(sub.lagged)
+        self.assertEqual(sub.queue.qsize(), QUEUE_SIZE)
+
+        sub.drain()
+        broker.unsubscribe(sub)
+        self.assertFalse(sub.lagged)
+        self.assertTrue(sub.queue.empty())
+
+
+class CommentStreamTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="critter", password="pass")
+        cls.note = Note.objects.create(title="Live", content="Hello")
+        cls.first = NoteComment.objects.create(note=cls.note, content="first", author=cls.user)
+        cls.second = NoteComment.objects.create(note=cls.note, content="second", author=cls.user)
+
+    def test_create_comment_redirects_to_note(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("create_comment"), {"note_id": self.note.id, "content": "hi"})
+        self.assertRedirects(response, reverse("note-detail", args=[self.note.slug]))
+        self.assertTrue(NoteComment.objects.filter(note=self.note, content="hi").exists())
+
+    async def test_stream_resumes_after_last_event_id(self):
+        url = reverse("note-comment-stream", args=[self.note.slug])
+        response = await self.async_client.get(url, headers={"Last-Event-ID": str(self.first.id)})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+        event = (await anext(chunks)).decode()
+        self.assertTrue(event.startswith(f"id: {self.second.id}\nevent: comment\n"))
+        self.assertIn('"content": "second"', event)
+        await chunks.aclose()
+
+    async def test_stream_pushes_published_comments(self):
+        url = reverse("note-comment-stream", args=[self.note.slug])
+        response = await self.async_client.get(url, headers={"Last-Event-ID": str(self.second.id)})
+
+        chunks = aiter(response.streaming_content)
+        await anext(chunks)
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+        get_broker().publish(self.note.id, (self.second.id + 1, "id: new\n\n"))
+        self.assertEqual(await asyncio.wait_for(pending, 5), b"id: new\n\n")
+        await chunks.aclose()
+
+    async def test_created_comment_is_pushed_to_open_stream(self):
+        url = reverse("note-comment-stream", args=[self.note.slug])
+        response = await self.async_client.get(url, headers={"Last-Event-ID": str(self.second.id)})
+        chunks = aiter(response.streaming_content)
+        await anext(chunks)
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+
+        def post_comment():
+            self.client.force_login(self.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse("create_comment"), {"note_id": self.note.id, "content": "live!"})
+            return NoteComment.objects.get(content="live!")
+
+        comment = await sync_to_async(post_comment)()
+        event = (await asyncio.wait_for(pending, 5)).decode()
+        self.assertTrue(event.startswith(f"id: {comment.id}\nevent: comment\n"))
+        self.assertIn('"content": "live!"', event)
+        self.assertIn('"author": "critter"', event)
+        await chunks.aclose()
+
+    async def test_lagging_stream_catches_up_from_database(self):
+        url = reverse("note-comment-stream", args=[self.note.slug])
+        response = await self.async_client.get(url, headers={"Last-Event-ID": str(self.second.id)})
+        chunks = aiter(response.streaming_content)
+        await anext(chunks)
+        # let the stream do its first catch-up and wait on its queue
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+
+        def add_comments():
+            NoteComment.objects.bulk_create(
+                NoteComment(note=self.note, content=f"burst {i}", author=self.user)
+                for i in range(QUEUE_SIZE + 5)
+            )
+            return list(NoteComment.objects.filter(id__gt=self.second.id).select_related("author").order_by("id"))
+
+        burst = await sync_to_async(add_comments)()
+        await asyncio.sleep(0)
+        self.assertFalse(pending.done())
+        # publish more than the queue holds before the stream gets to run
+        broker = get_broker()
+        for comment in burst:
+            broker.publish(self.note.id, comment_event(comment))
+
+        def event_id(chunk):
+            return int(chunk.decode().split("\n", 1)[0].removeprefix("id: "))
+
+        received = [event_id(await asyncio.wait_for(pending, 5))]
+        for _ in burst[1:]:
+            received.append(event_id(await asyncio.wait_for(anext(chunks), 5)))
+        self.assertEqual(received, [comment.id for comment in burst])
+
+        # events already sent must not come out twice
+        for comment in burst[:3]:
+            broker.publish(self.note.id, comment_event(comment))
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(anext(chunks), 0.2)
+
+    def test_stream_under_wsgi_tells_eventsource_to_stop(self):
+        response = self.client.get(reverse("note-comment-stream", args=[self.note.slug]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+
+    def test_detail_page_skips_stream_under_wsgi(self):
+        url = reverse("note-detail", args=[self.note.slug])
+        self.assertNotContains(self.client.get(url), "EventSource")
+
+    async def test_detail_page_opens_stream_under_asgi(self):
+        response = await self.async_client.get(reverse("note-detail", args=[self.note.slug]))
+        self.assertContains(response, "EventSource")
+
+    async def test_stream_unknown_note(self):
+        response = await self.async_client.get(reverse("note-comment-stream", args=["missing"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class PollingCommentBrokerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="critter", password="pass")
+        cls.note = Note.objects.create(title="Polled", content="Hello")
+        cls.old = NoteComment.objects.create(note=cls.note, content="old", author=cls.user)
+
+    def setUp(self):
+        self.broker = PollingCommentBroker()
+        self.broker.interval = 0.01
+        patcher = mock.patch("notes.streams._broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def wait_for_poller_to_stop(self):
+        for _ in range(100):
+            if self.note.id not in self.broker._pollers:
+                return
+            await asyncio.sleep(self.broker.interval)
+        self.fail("poller still running")
+
+    async def test_poller_does_not_push_history(self):
+        sub = self.broker.subscribe(self.note.id)
+        await asyncio.sleep(self.broker.interval * 5)
+        self.assertTrue(sub.queue.empty())
+
+        comment = await NoteComment.objects.acreate(note=self.note, content="new", author=self.user)
+        await asyncio.sleep(self.broker.interval * 5)
+        self.assertEqual(sub.queue.qsize(), 1)
+        self.assertEqual(sub.queue.get_nowait()[0], comment.id)
+
+        self.broker.unsubscribe(sub)
+        await self.wait_for_poller_to_stop()
+
+    async def test_unpublished_comment_reaches_stream_once(self):
+        url = reverse("note-comment-stream", args=[self.note.slug])
+        response = await self.async_client.get(url)
+        chunks = aiter(response.streaming_content)
+        await anext(chunks)
+        self.assertIn(f"id: {self.old.id}\n".encode(), await anext(chunks))
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(self.broker.interval * 5)
+
+        # saved straight to the database, nothing calls publish
+        comment = await NoteComment.objects.acreate(note=self.note, content="polled", author=self.user)
+        event = (await asyncio.wait_for(pending, 5)).decode()
+        self.assertTrue(event.startswith(f"id: {comment.id}\nevent: comment\n"))
+        self.assertIn('"content": "polled"', event)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(anext(chunks), self.broker.interval * 10)
+
+        await chunks.aclose()
+        self.assertNotIn(self.note.id, self.broker._subscribers)
+        await self.wait_for_poller_to_stop()
+
@@ -9,5 +9,6 @@ urlpatterns = [
     path("update/<slug:slug>/", views.NoteUpdate.as_view(), name='note-update'),
     path("delete/<slug:slug>/", views.NoteDelete.as_view(), name='note-delete'),
     path("create_comment/", views.create_comment, name='create_comment'),
+    path("stream/<slug:slug>/", views.comment_stream, name='note-comment-stream'),
 
 ]
\ No newline at end of file
@@ -1,8 +1,13 @@
 from django.shortcuts import render, redirect
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.views.generic import ListView, CreateView, DetailView, UpdateView, DeleteView
 from .models import Note, NoteComment
 from django.urls import reverse_lazy
 from .forms import NoteForm
+from .streams import comment_event, comment_events, get_broker
+from config.streaming import stream_list_page
 
 
 """
@@ -24,9 +29,19 @@ LoginView   = login
 
 class NoteList(ListView):
     model = Note
+    # the cards only show the excerpt, skip loading the full body
+    queryset = Note.objects.defer('content', 'content_html')
     template_name = 'notes/list.html'
+    ordering = ['-created_on']
     # context_object_name = 'all_notes'
 
+    def render_to_response(self, context, **response_kwargs):
+        # send the page head right away, the cards follow in chunks
+        return stream_list_page(
+            self.request, self.template_name, context,
+            'notes/list_cards.html', self.object_list, 'note_list',
+        )
+
 class NoteCreate(CreateView):
     model = Note
     form_class = NoteForm
@@ -49,6 +64,17 @@ class NoteDetail(DetailView):
         slug = self.kwargs.get('slug')
         return get_object_or_404(Note, slug=slug)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["comments"] = (
+            NoteComment.objects.filter(note=self.object)
+            .select_related("author")
+            .order_by("-created_on")
+        )
+        # the live stream needs the ASGI server, see comment_stream
+        context["live_comments"] = isinstance(self.request, ASGIRequest)
+        return context
+
     
 class NoteDelete(DeleteView):
     template_name = "notes/delete.html"
@@ -60,16 +86,6 @@ class NoteDelete(DeleteView):
         return get_object_or_404(Note, slug=slug)
     
 
-
-
-class NoteDetail(DetailView):
-    template_name = "notes/details.html"
-    model = Note
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["comments"] = NoteComment.objects.filter(note=self.object).order_by("-created_on")
-        return context
     
 class NoteUpdate(UpdateView):
     model = Note
@@ -92,14 +108,41 @@ def create_comment(request):
     note_id = request.POST.get('note_id')
     user =request.user
 
-    note = Note.objects.get(id=note_id)
+    note = get_object_or_404(Note, id=note_id)
 
-    comment = NoteComment.objects.created(
+    comment = NoteComment.objects.create(
         note = note,
         content = content,
         author = user,
     )
 
-    comment.save()
+    # push the new comment to everyone watching the note
+    event = comment_event(comment)
+    transaction.on_commit(lambda: get_broker().publish(note.id, event))
+
+    return redirect('note-detail', slug=note.slug)
+
+
+async def comment_stream(request, slug):
+    """Server-Sent Events stream of new comments, needs the ASGI server."""
+    if not isinstance(request, ASGIRequest):
+        # under WSGI the endless stream would be buffered and hold a worker
+        # forever, 204 tells EventSource to stop reconnecting
+        return HttpResponse(status=204)
+
+    note = await Note.objects.filter(slug=slug).only('id').afirst()
+    if note is None:
+        raise Http404("No note found")
+
+    # EventSource resends the last id on reconnect, the page passes the
+    # newest comment it rendered on the first connect
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('after') or 0
+    try:
+        last_id = int(last_id)
+    except ValueError:
+        last_id = 0
 
-    return redirect('note-detail', pk=note_id)
\ No newline at end of file
+    response = StreamingHttpResponse(comment_events(note.id, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
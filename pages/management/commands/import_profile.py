@@ -0,0 +1,119 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# every script runs in a fresh interpreter so the numbers are cold starts
+IMPORT_SCRIPT = """
+import django
+from django.conf import settings
+from django.utils.module_loading import import_string
+django.setup()
+import_string(settings.WSGI_APPLICATION)
+__import__(settings.ROOT_URLCONF)
+"""
+
+WSGI_SCRIPT = """
+import sys
+from wsgiref.util import setup_testing_defaults
+from django.utils.module_loading import import_string
+
+application = import_string(sys.argv[2])
+environ = {'PATH_INFO': sys.argv[1]}
+setup_testing_defaults(environ)
+status = []
+b''.join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+print(status[0].split()[0])
+"""
+
+ASGI_SCRIPT = """
+import asyncio, sys
+from django.utils.module_loading import import_string
+
+async def main():
+    application = import_string(sys.argv[2])
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': sys.argv[1],
+        'raw_path': sys.argv[1].encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'127.0.0.1')],
+        'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 80),
+    }
+    sent = []
+    body = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if body:
+            return body.pop()
+        await asyncio.Future()  # never disconnect
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    print(sent[0]['status'])
+
+asyncio.run(main())
+"""
+
+
+class Command(BaseCommand):
+    help = 'Report cumulative import time per module and cold-start times for check and the first request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Number of modules to list')
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts per benchmark, 0 to skip them')
+        parser.add_argument('--path', default='/', help='URL requested for the first-request benchmarks')
+
+    def handle(self, *args, **options):
+        self.env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+
+        self.stdout.write(f"Cumulative import time, top {options['limit']} modules:")
+        for cumulative, own, module in self.import_times()[:options['limit']]:
+            self.stdout.write(f"  {cumulative / 1000:9.1f} ms  (self {own / 1000:7.1f} ms)  {module}")
+
+        if options['runs'] < 1:
+            return
+
+        path = options['path']
+        benchmarks = [
+            ('manage.py check', ['manage.py', 'check'], None),
+            (f'first WSGI request {path}', ['-c', WSGI_SCRIPT, path, settings.WSGI_APPLICATION], '200'),
+            (f'first ASGI request {path}', ['-c', ASGI_SCRIPT, path, settings.ASGI_APPLICATION], '200'),
+        ]
+        self.stdout.write(f"\nCold start, best / median of {options['runs']} runs:")
+        for label, argv, expected in benchmarks:
+            timings = [self.time_run(label, argv, expected) for _ in range(options['runs'])]
+            self.stdout.write(f"  {label:<30} {min(timings):8.1f} ms / {statistics.median(timings):8.1f} ms")
+
+    def run(self, argv, extra=(), label=None):
+        result = subprocess.run(
+            [sys.executable, *extra, *argv],
+            cwd=settings.BASE_DIR, env=self.env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"{label or ' '.join(argv)} failed:\n{result.stderr}")
+        return result
+
+    def import_times(self):
+        result = self.run(['-c', IMPORT_SCRIPT], extra=['-X', 'importtime'], label='import profile')
+        rows = []
+        for line in result.stderr.splitlines():
+            # import time:       123 |       4567 |   package.module
+            if not line.startswith('import time:') or 'imported package' in line:
+                continue
+            own, cumulative, module = line[len('import time:'):].split('|')
+            rows.append((int(cumulative), int(own), module.strip()))
+        return sorted(rows, reverse=True)
+
+    def time_run(self, label, argv, expected):
+        start = time.perf_counter()
+        result = self.run(argv, label=label)
+        elapsed = (time.perf_counter() - start) * 1000
+        if expected and result.stdout.strip() != expected:
+            raise CommandError(f"{label}: expected status {expected}, got {result.stdout.strip()}")
+        return elapsed
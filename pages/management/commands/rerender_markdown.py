@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+
+from config import rendering
+from content.models import Project
+from notes.models import Note
+
+# model, source field, html field, hash field
+TARGETS = [
+    (Note, 'content', 'content_html', 'content_hash'),
+    (Project, 'description', 'description_html', 'description_hash'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Re-render stored Markdown HTML for notes and projects whose source or renderer version changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows rendered per worker task')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes')
+        parser.add_argument('--force', action='store_true', help='Re-render every row, not only stale ones')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # keep only a couple of batches per worker queued, not the whole table
+        max_in_flight = options['workers'] * 2
+
+        # workers need the settings configured for the excerpt truncation
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            for model, source, html, digest in TARGETS:
+                fields = [html, 'excerpt', digest]
+                in_flight = {}
+                updated = 0
+                for batch in self.stale_batches(model, source, digest, batch_size, options['force']):
+                    if len(in_flight) >= max_in_flight:
+                        updated += self.write_back(model, fields, in_flight, FIRST_COMPLETED)
+                    pks = [pk for pk, _ in batch]
+                    texts = [text for _, text in batch]
+                    in_flight[pool.submit(rendering.render_batch, texts)] = pks
+                while in_flight:
+                    updated += self.write_back(model, fields, in_flight, FIRST_COMPLETED)
+
+                name = model._meta.verbose_name_plural
+                self.stdout.write(self.style.SUCCESS(f'Re-rendered {updated} {name}.'))
+
+    def write_back(self, model, fields, in_flight, return_when):
+        done, _ = wait(in_flight, return_when=return_when)
+        updated = 0
+        for future in done:
+            pks = in_flight.pop(future)
+            rows = [
+                model(pk=pk, **dict(zip(fields, rendered)))
+                for pk, rendered in zip(pks, future.result())
+            ]
+            model.objects.bulk_update(rows, fields)
+            updated += len(rows)
+        return updated
+
+    def stale_batches(self, model, source, digest, batch_size, force):
+        # page by primary key so no cursor stays open while rows are written
+        batch = []
+        last_pk = 0
+        while True:
+            rows = list(
+                model.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', source, digest)[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            for pk, text, stored in rows:
+                if force or stored != rendering.content_hash(text):
+                    batch.append((pk, text))
+                    if len(batch) == batch_size:
+                        yield batch
+                        batch = []
+        if batch:
+            yield batch
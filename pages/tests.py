@@ -1,3 +1,128 @@
-from django.test import TestCase
+import os
+import subprocess
+import sys
+import tempfile
+import zlib
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from config.mail import CertifiEmailBackend
+from config.middleware import StreamingGZipMiddleware
+from config.settings import environment as env_module
 
 # Create your tests here.
+
+
+class EnvTests(SimpleTestCase):
+
+    def setUp(self):
+        env_module._env_file.cache_clear()
+        self.addCleanup(env_module._env_file.cache_clear)
+
+    def test_environment_wins_over_env_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env_file = Path(tmp) / '.env'
+            env_file.write_text("# mail\nSMTP_EMAIL='file@example.com'\nexport SMTP_PASS=secret\n")
+            with mock.patch.object(env_module, 'ENV_FILE', env_file), \
+                    mock.patch.dict(os.environ, {'SMTP_EMAIL': 'os@example.com'}):
+                self.assertEqual(env_module.env('SMTP_EMAIL'), 'os@example.com')
+                self.assertEqual(env_module.env('SMTP_PASS'), 'secret')
+                self.assertEqual(env_module.env('MISSING', 'default'), 'default')
+
+    def test_settings_import_does_not_read_env_file(self):
+        script = (
+            "import django; django.setup(); "
+            "from config.settings import environment; "
+            "print(environment._env_file.cache_info().misses)"
+        )
+        env = {k: v for k, v in os.environ.items() if k not in ('DJANGO_ENV', 'SMTP_EMAIL', 'SMTP_PASS')}
+        env['DJANGO_SETTINGS_MODULE'] = 'config.settings'
+        result = subprocess.run([sys.executable, '-c', script], cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '0')
+
+
+class CertifiEmailBackendTests(SimpleTestCase):
+
+    def message(self):
+        return EmailMessage("Hi", "Body", "from@example.com", ["to@example.com"])
+
+    def test_credentials_are_read_when_the_backend_is_created(self):
+        with mock.patch('config.mail.env', side_effect={'SMTP_EMAIL': 'me@example.com', 'SMTP_PASS': 'pw'}.get):
+            backend = CertifiEmailBackend()
+        self.assertEqual((backend.username, backend.password), ('me@example.com', 'pw'))
+
+    @override_settings(DEBUG=True)
+    def test_debug_without_credentials_prints_the_email(self):
+        with mock.patch('config.mail.env', return_value=''), \
+                mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+            self.assertEqual(CertifiEmailBackend().send_messages([self.message()]), 1)
+        self.assertIn('Subject: Hi', stdout.getvalue())
+
+    @override_settings(DEBUG=False)
+    def test_production_without_credentials_refuses_to_send(self):
+        with mock.patch('config.mail.env', return_value=''):
+            with self.assertRaises(ImproperlyConfigured):
+                CertifiEmailBackend().send_messages([self.message()])
+
+
+class ImportProfileTests(SimpleTestCase):
+
+    def test_reports_modules_and_cold_starts(self):
+        out = StringIO()
+        call_command('import_profile', limit=3, runs=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn('Cumulative import time, top 3 modules:', output)
+        self.assertIn('manage.py check', output)
+        self.assertIn('first WSGI request /', output)
+        self.assertIn('first ASGI request /', output)
+
+
+class StreamingGZipMiddlewareTests(SimpleTestCase):
+
+    def compress(self, response, accept="gzip"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        return StreamingGZipMiddleware(lambda request: response)(request)
+
+    def test_every_chunk_is_decodable_on_arrival(self):
+        response = self.compress(StreamingHttpResponse(iter([b"<head>", b"<cards>", b"</html>"])))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        parts = iter(response.streaming_content)
+        self.assertEqual(decoder.decompress(next(parts)), b"<head>")
+        self.assertEqual(decoder.decompress(next(parts)), b"<cards>")
+        self.assertEqual(decoder.decompress(b"".join(parts)), b"</html>")
+        self.assertTrue(decoder.eof)
+
+    async def test_async_stream_is_one_gzip_stream(self):
+        async def content():
+            yield b"<head>"
+            yield b"</html>"
+
+        response = self.compress(StreamingHttpResponse(content()))
+        body = b"".join([part async for part in response.streaming_content])
+        self.assertEqual(zlib.decompress(body, 16 + zlib.MAX_WBITS), b"<head></html>")
+
+    def test_without_gzip_support_stream_is_untouched(self):
+        response = self.compress(StreamingHttpResponse(iter([b"plain"])), accept="")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), b"plain")
+
+    def test_event_streams_are_not_compressed(self):
+        response = self.compress(StreamingHttpResponse(iter([b"data: 1\n\n"]), content_type="text/event-stream"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), b"data: 1\n\n")
+
+    def test_regular_responses_use_django_gzip(self):
+        response = self.compress(HttpResponse(b"a" * 500))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(zlib.decompress(response.content, 16 + zlib.MAX_WBITS), b"a" * 500)